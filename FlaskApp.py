@@ -1,11 +1,25 @@
-from flask import Flask, request, jsonify
-from pydantic import BaseModel
-from typing import List, Dict
+from flask import Flask, Response, request, jsonify, stream_with_context
+from pydantic import BaseModel, ConfigDict, Field, ValidationError
+from typing import Annotated, List, Dict, Optional, Union
 from deep_translator import GoogleTranslator
-import uuid
+import deep_translator.google
+import requests
+from requests.adapters import HTTPAdapter
+from types import SimpleNamespace
+from functools import lru_cache
+from cachetools import TTLCache
+from concurrent.futures import ThreadPoolExecutor
+from collections import OrderedDict
+import copy
+import threading
+import hashlib
+import secrets
 import json
 import os
+import sys
+import orjson
 from flask_cors import CORS
+from werkzeug.exceptions import BadRequest
 from dotenv import load_dotenv
 
 # Google Gemini SDK for LLM integration
@@ -23,14 +37,87 @@ gemini_api_key = os.getenv("GEMINI_API_KEY")
 if not gemini_api_key:
     raise ValueError("GEMINI_API_KEY not found. Please set it in your .env file.")
 
-genai.configure(api_key=gemini_api_key)
+# Use the gRPC transport so calls share one persistent HTTP/2 channel instead
+# of setting up a new HTTPS connection per request
+GEMINI_TRANSPORT = os.getenv("GEMINI_TRANSPORT", "grpc")
+if GEMINI_TRANSPORT == "grpc" and "gevent" in sys.modules:
+    from gevent import monkey
+    if monkey.is_module_patched("socket"):
+        # Under gevent workers gRPC must be switched to its gevent-aware mode
+        import grpc.experimental.gevent as grpc_gevent
+        grpc_gevent.init_gevent()
+
+genai.configure(api_key=gemini_api_key, transport=GEMINI_TRANSPORT)
 
 # Initialize Gemini model
 # Using gemini-1.5-flash for fast document generation
 model = genai.GenerativeModel('gemini-1.5-flash')
 
-# Store documents in memory (in production, use a database)
-documents = {}
+# Cap the number of Gemini requests in flight across all request threads
+MAX_CONCURRENT_LLM_CALLS = int(os.getenv("MAX_CONCURRENT_LLM_CALLS", "32"))
+llm_semaphore = threading.BoundedSemaphore(MAX_CONCURRENT_LLM_CALLS)
+
+GENERATION_CONFIG = {
+    "temperature": 0.7,
+    "top_p": 0.95,
+    "top_k": 40,
+    "max_output_tokens": 8192,
+}
+
+# Cache Gemini responses keyed on a hash of (prompt, generation config) so
+# re-submitted prompts skip the LLM round trip
+GEMINI_CACHE_TTL = int(os.getenv("GEMINI_CACHE_TTL", "86400"))
+response_cache = TTLCache(maxsize=10_000, ttl=GEMINI_CACHE_TTL)
+response_cache_lock = threading.Lock()  # TTLCache is not thread-safe
+
+# Prompt templates, built once at import time and filled in with .format()
+QUESTION_PROMPT_TEMPLATE = (
+    "Generate a list of specific questions that will help clarify the names and details needed to create a {doc_type}. "
+    "Focus on gathering names, dates, and other essential information. "
+    "Provide exactly 8-10 clear questions, one per line, numbered."
+)
+
+DOC_PROMPT_TEMPLATE = (
+    "You are a professional legal document expert. Generate a complete and properly formatted {doc_type} "
+    "using the following details:\n\n{answers_text}\n\n"
+    "The document should be:\n"
+    "- Professionally formatted\n"
+    "- Legally sound\n"
+    "- Complete with all necessary sections\n"
+    "- Ready to use\n\n"
+    "Generate the complete document now:"
+)
+
+# Used in place of the answers when none were provided
+NO_ANSWERS_TEXT = "No specific details provided. Generate a template document."
+
+# Tokens that stand in for the template placeholders while the template is
+# translated, since Google Translate would otherwise mangle "{doc_type}"
+TEMPLATE_PLACEHOLDER_TOKENS = {
+    "{doc_type}": "TYPEXYZ",
+    "{answers_text}": "DETAILSXYZ",
+}
+
+# The most commonly requested document types. Their question prompts are
+# built once up front (English at import, Hindi once its template has been
+# translated) so requests for them skip prompt construction entirely.
+COMMON_DOC_TYPES = [
+    "NDA",
+    "Non-Disclosure Agreement",
+    "Rental Agreement",
+    "Lease Agreement",
+    "Employment Contract",
+    "Partnership Agreement",
+    "Power of Attorney",
+    "Sale Deed",
+    "Will",
+    "Affidavit",
+]
+
+QUESTION_PROMPTS = {
+    (doc_type, "English"): QUESTION_PROMPT_TEMPLATE.format(doc_type=doc_type)
+    for doc_type in COMMON_DOC_TYPES
+}
 
 class Question(BaseModel):
     question: str
@@ -44,32 +131,399 @@ class LegalDocument(BaseModel):
     language: str
     answers: Dict[str, str]
 
+# Request bodies, validated before any translation or LLM work is done
+class GenerateQuestionsRequest(BaseModel):
+    doc_type: str = Field(min_length=1)
+    language: str = 'English'
+
+# Unanswered questions may be sent as null (they are skipped when the prompt is
+# built) and numeric answers are accepted as text
+class GenerateDocumentRequest(BaseModel):
+    model_config = ConfigDict(coerce_numbers_to_str=True)
+
+    doc_type: str = Field(min_length=1)
+    title: Optional[str] = None
+    answers: Dict[str, Optional[str]] = {}
+    language: str = 'English'
+
+class EditDocumentRequest(BaseModel):
+    model_config = ConfigDict(coerce_numbers_to_str=True)
+
+    document_text: Optional[str] = None
+    title: Optional[str] = None
+    answers: Optional[Dict[str, Optional[str]]] = None
+    regenerate: bool = False
+
+# Upper bound on the strings a single /translate request may fan out to
+MAX_TRANSLATE_BATCH = 100
+
+class TranslateRequest(BaseModel):
+    text: Union[str, Annotated[List[str], Field(max_length=MAX_TRANSLATE_BATCH)]]
+    target: str = 'hi'
+
+class MemoryDocumentStore:
+    """Store documents in process memory (not shared between workers).
+
+    Holds at most max_documents, evicting the oldest document when full so
+    memory use stays bounded. Documents stay in insertion order, so reads
+    never reorder the /documents listing behind its ETag.
+    """
+
+    def __init__(self, max_documents: int = 10_000, template_ttl: int = 30 * 86400):
+        self._documents = OrderedDict()
+        self._max_documents = max_documents
+        self._templates = TTLCache(maxsize=1024, ttl=template_ttl)
+        self._lock = threading.Lock()
+        # Versions are prefixed per process so ETags from different workers never collide
+        self._instance_id = secrets.token_hex(4)
+        self._version = 0
+
+    def get(self, doc_id: str) -> Optional[dict]:
+        # Return a copy so changes only reach the store (and its version) via save()
+        with self._lock:
+            document = self._documents.get(doc_id)
+            if document is None:
+                return None
+            return copy.deepcopy(document)
+
+    def save(self, document: dict) -> None:
+        with self._lock:
+            self._documents[document['id']] = document
+            while len(self._documents) > self._max_documents:
+                self._documents.popitem(last=False)
+            self._version += 1
+
+    def delete(self, doc_id: str) -> bool:
+        with self._lock:
+            if self._documents.pop(doc_id, None) is None:
+                return False
+            self._version += 1
+            return True
+
+    def all(self) -> List[dict]:
+        with self._lock:
+            return list(self._documents.values())
+
+    def version(self) -> str:
+        """Identifier that changes whenever any document is saved or deleted"""
+        return f"{self._instance_id}-{self._version}"
+
+    def get_template(self, doc_type: str, language: str) -> Optional[str]:
+        """Return the cached template document text for a document type"""
+        with self._lock:
+            return self._templates.get((doc_type, language))
+
+    def save_template(self, doc_type: str, language: str, document_text: str) -> None:
+        with self._lock:
+            self._templates[(doc_type, language)] = document_text
+
+class RedisDocumentStore:
+    """Store documents in Redis as JSON so every worker sees the same documents"""
+
+    KEY_PREFIX = "doc:"
+    VERSION_KEY = "docs:version"
+    TEMPLATE_KEY_PREFIX = "template:"
+
+    def __init__(self, url: str, template_ttl: int = 30 * 86400):
+        import redis  # Only needed when REDIS_URL is configured
+        self._redis = redis.Redis.from_url(url)
+        self._template_ttl = template_ttl
+
+    def _key(self, doc_id: str) -> str:
+        return f"{self.KEY_PREFIX}{doc_id}"
+
+    def get(self, doc_id: str) -> Optional[dict]:
+        raw = self._redis.get(self._key(doc_id))
+        return orjson.loads(raw) if raw is not None else None
+
+    # Writes and the version bump go in one transaction so the ETag can't
+    # fall behind the stored documents
+
+    def save(self, document: dict) -> None:
+        pipe = self._redis.pipeline(transaction=True)
+        pipe.set(self._key(document['id']), orjson.dumps(document))
+        pipe.incr(self.VERSION_KEY)
+        pipe.execute()
+
+    def delete(self, doc_id: str) -> bool:
+        pipe = self._redis.pipeline(transaction=True)
+        pipe.delete(self._key(doc_id))
+        pipe.incr(self.VERSION_KEY)
+        deleted, _ = pipe.execute()
+        return deleted > 0
+
+    def all(self) -> List[dict]:
+        # SCAN may return a key more than once, so de-duplicate before MGET
+        keys = list(dict.fromkeys(self._redis.scan_iter(match=f"{self.KEY_PREFIX}*", count=500)))
+        if not keys:
+            return []
+        return [orjson.loads(raw) for raw in self._redis.mget(keys) if raw is not None]
+
+    def version(self) -> str:
+        """Identifier that changes whenever any document is saved or deleted"""
+        return f"redis-{int(self._redis.get(self.VERSION_KEY) or 0)}"
+
+    def _template_key(self, doc_type: str, language: str) -> str:
+        # Hash the pair so user-supplied values containing ":" can't collide
+        digest = hashlib.sha256(orjson.dumps([language, doc_type])).hexdigest()
+        return f"{self.TEMPLATE_KEY_PREFIX}{digest}"
+
+    def get_template(self, doc_type: str, language: str) -> Optional[str]:
+        """Return the cached template document text for a document type"""
+        raw = self._redis.get(self._template_key(doc_type, language))
+        return raw.decode() if raw is not None else None
+
+    def save_template(self, doc_type: str, language: str, document_text: str) -> None:
+        self._redis.set(self._template_key(doc_type, language), document_text, ex=self._template_ttl)
+
+# Use Redis when configured so the app can run as multiple workers/containers,
+# otherwise fall back to storing documents in memory
+redis_url = os.getenv("REDIS_URL")
+MAX_DOCS = int(os.getenv("MAX_DOCS", "10000"))
+# Documents generated without any answers depend only on (doc_type, language),
+# so they are kept much longer than ordinary Gemini responses
+TEMPLATE_CACHE_TTL = int(os.getenv("TEMPLATE_CACHE_TTL", str(30 * 86400)))
+if redis_url:
+    documents = RedisDocumentStore(redis_url, TEMPLATE_CACHE_TTL)
+else:
+    documents = MemoryDocumentStore(MAX_DOCS, TEMPLATE_CACHE_TTL)
+
+# deep-translator calls requests.get() directly, opening a new connection (and
+# TLS handshake) per translation; route it through one pooled session instead
+translator_session = requests.Session()
+translator_session.mount("https://", HTTPAdapter(pool_connections=32, pool_maxsize=32))
+deep_translator.google.requests = SimpleNamespace(get=translator_session.get)
+
+def get_translator(target: str) -> GoogleTranslator:
+    """Return a GoogleTranslator for the target language.
+
+    GoogleTranslator stores per-call request parameters on the instance, so
+    instances are not shared; they are cheap to build since the constructor
+    does no I/O and connections come from the pooled session.
+    """
+    return GoogleTranslator(source='auto', target=target)
+
+# Shared pool for running independent (blocking) translations concurrently
+translation_executor = ThreadPoolExecutor(max_workers=8)
+
 def translate_to_hindi(text: str) -> str:
     """Translate text to Hindi using Google Translator"""
     try:
-        translated = GoogleTranslator(source='auto', target='hi').translate(text)
-        return translated
+        return get_translator('hi').translate(text)
     except Exception as e:
         print(f"Translation error: {e}")
         return text  # Return the original text in case of an error
 
+# Translated prompt templates. A template whose translation mangled a
+# placeholder is only remembered for a while, then translated again.
+hindi_templates = {}
+hindi_template_failures = TTLCache(maxsize=16, ttl=600)
+hindi_templates_lock = threading.Lock()
+
+def hindi_template(template: str) -> Optional[str]:
+    """Translate a prompt template to Hindi once, keeping its placeholders intact.
+
+    Returns None when the translation dropped or duplicated a placeholder, in
+    which case callers translate the filled-in prompt instead.
+    """
+    with hindi_templates_lock:
+        if template in hindi_templates:
+            return hindi_templates[template]
+        if template in hindi_template_failures:
+            return None
+
+    skeleton = template
+    for placeholder, token in TEMPLATE_PLACEHOLDER_TOKENS.items():
+        skeleton = skeleton.replace(placeholder, token)
+
+    # Let translation errors propagate so they are not remembered
+    translated = get_translator('hi').translate(skeleton)
+    translated = translated.replace('{', '{{').replace('}', '}}')
+    for placeholder, token in TEMPLATE_PLACEHOLDER_TOKENS.items():
+        if translated.count(token) != template.count(placeholder):
+            print(f"Translated template lost placeholder {placeholder}")
+            with hindi_templates_lock:
+                hindi_template_failures[template] = True
+            return None
+        translated = translated.replace(token, placeholder)
+
+    with hindi_templates_lock:
+        hindi_templates[template] = translated
+    return translated
+
+def render_prompt(template: str, language: str, **fields) -> str:
+    """Fill in a prompt template in the requested language"""
+    if language == "Hindi":
+        try:
+            translated = hindi_template(template)
+        except Exception as e:
+            print(f"Translation error: {e}")
+            translated = None
+        if translated is None:
+            return translate_to_hindi(template.format(**fields))
+        return translated.format(**fields)
+    return template.format(**fields)
+
+def question_prompt(doc_type: str, language: str) -> str:
+    """Return the question prompt, using the precomputed one when available"""
+    prompt = QUESTION_PROMPTS.get((doc_type, language))
+    if prompt is None:
+        prompt = render_prompt(QUESTION_PROMPT_TEMPLATE, language, doc_type=doc_type)
+    return prompt
+
+def build_answers_text(answers: Dict[str, Optional[str]]) -> str:
+    """Join the non-empty answers into the details section of the document prompt"""
+    answers_text = ' '.join(f"{q}: {a}" for q, a in answers.items() if a)
+    # If no answers provided, ask for a template document instead
+    return answers_text or NO_ANSWERS_TEXT
+
+def build_doc_prompt(doc_type: str, answers_text: str, language: str) -> str:
+    """Return the document-generation prompt in the requested language"""
+    return render_prompt(DOC_PROMPT_TEMPLATE, language, doc_type=doc_type, answers_text=answers_text)
+
+def get_template_document(doc_type: str, answers: Dict[str, Optional[str]], language: str) -> Optional[str]:
+    """Return the cached template document when no answers were given"""
+    # With no answers the result depends only on (doc_type, language)
+    if any(answers.values()):
+        return None
+    return documents.get_template(doc_type, language)
+
+def save_template_document(doc_type: str, answers: Dict[str, Optional[str]], language: str, document_text: str) -> None:
+    """Cache a generated document if it is a template document (no answers)"""
+    if not any(answers.values()):
+        documents.save_template(doc_type, language, document_text)
+
+def generate_document_text(doc_type: str, answers: Dict[str, Optional[str]], language: str) -> str:
+    """Generate the document text, serving template documents from the cache"""
+    cached = get_template_document(doc_type, answers, language)
+    if cached is not None:
+        return cached
+
+    document_text = generate_with_gemini(build_doc_prompt(doc_type, build_answers_text(answers), language))
+    save_template_document(doc_type, answers, language, document_text)
+    return document_text
+
+def warm_hindi_templates():
+    """Translate the prompt templates ahead of the first Hindi request"""
+    translated = {}
+    for template in (QUESTION_PROMPT_TEMPLATE, DOC_PROMPT_TEMPLATE):
+        try:
+            translated[template] = hindi_template(template)
+        except Exception as e:
+            print(f"Translation error: {e}")
+
+    # Precompute the Hindi question prompts for the common document types
+    hindi_question_template = translated.get(QUESTION_PROMPT_TEMPLATE)
+    if hindi_question_template is not None:
+        for doc_type in COMMON_DOC_TYPES:
+            QUESTION_PROMPTS[(doc_type, "Hindi")] = hindi_question_template.format(doc_type=doc_type)
+
+# Warm up in the background so startup doesn't block on the translator
+threading.Thread(target=warm_hindi_templates, daemon=True).start()
+
+def gemini_cache_key(prompt: str) -> str:
+    """Hash a prompt together with the generation config for the response cache"""
+    return hashlib.sha256(
+        (prompt + json.dumps(GENERATION_CONFIG, sort_keys=True)).encode()
+    ).hexdigest()
+
 def generate_with_gemini(prompt: str) -> str:
-    """Generate content using Gemini API"""
+    """Generate content using Gemini API, reusing cached responses"""
+    cache_key = gemini_cache_key(prompt)
+    with response_cache_lock:
+        cached = response_cache.get(cache_key)
+    if cached is not None:
+        return cached
+
+    try:
+        with llm_semaphore:
+            response = model.generate_content(
+                prompt,
+                generation_config=genai.GenerationConfig(**GENERATION_CONFIG)
+            )
+        text = response.text.strip()
+    except Exception as e:
+        print(f"Gemini API error: {e}")
+        raise e
+
+    with response_cache_lock:
+        response_cache[cache_key] = text
+    return text
+
+def stream_with_gemini(prompt: str):
+    """Yield generated text from Gemini as it arrives"""
+    cache_key = gemini_cache_key(prompt)
+    with response_cache_lock:
+        cached = response_cache.get(cache_key)
+    if cached is not None:
+        yield cached
+        return
+
+    chunks = []
     try:
-        response = model.generate_content(
-            prompt,
-            generation_config=genai.GenerationConfig(
-                temperature=0.7,
-                top_p=0.95,
-                top_k=40,
-                max_output_tokens=8192,
+        # Only hold an LLM slot while starting the request, not while a
+        # (possibly slow) client reads the stream
+        with llm_semaphore:
+            response = model.generate_content(
+                prompt,
+                generation_config=genai.GenerationConfig(**GENERATION_CONFIG),
+                stream=True
             )
-        )
-        return response.text.strip()
+        for chunk in response:
+            chunks.append(chunk.text)
+            yield chunk.text
     except Exception as e:
         print(f"Gemini API error: {e}")
         raise e
 
+    with response_cache_lock:
+        response_cache[cache_key] = ''.join(chunks).strip()
+
+@lru_cache(maxsize=512)
+def get_questions(doc_type: str, language: str) -> tuple:
+    """Generate the questions for a document type, cached per (doc_type, language)"""
+    # Generate questions using Gemini
+    questions_text = generate_with_gemini(question_prompt(doc_type, language))
+
+    # Split and clean questions (a tuple, so the cached value can't be mutated)
+    return tuple(q.strip() for q in questions_text.strip().split('\n') if q.strip())
+
+def save_new_document(title: str, document_text: str, doc_type: str, language: str, answers: Dict[str, Optional[str]]) -> dict:
+    """Create a document with a fresh ID and add it to the store"""
+    # Create a unique ID for the document
+    doc_id = secrets.token_hex(16)
+
+    document = {
+        "id": doc_id,
+        "title": title,
+        "document_text": document_text,
+        "doc_type": doc_type,
+        "language": language,
+        "answers": answers
+    }
+    documents.save(document)
+    return document
+
+def parse_body(model):
+    """Validate the JSON request body against a pydantic model.
+
+    Raises BadRequest (400) when the body is missing or not valid JSON, and
+    ValidationError (422) when it does not match the model.
+    """
+    data = request.get_json(silent=True, cache=True)
+    if data is None:
+        raise BadRequest("Request body must be valid JSON")
+    return model.model_validate(data)
+
+def json_response(obj, status: int = 200) -> Response:
+    """Serialize a (potentially large) payload with orjson instead of jsonify"""
+    return app.response_class(orjson.dumps(obj), status=status, mimetype="application/json")
+
+def sse_event(data: dict, event: Optional[str] = None) -> str:
+    """Format a server-sent event with a JSON payload"""
+    prefix = f"event: {event}\n" if event else ""
+    return f"{prefix}data: {json.dumps(data)}\n\n"
+
 @app.route('/api/health', methods=['GET'])
 def health_check():
     """Health check endpoint"""
@@ -81,33 +535,9 @@ def health_check():
 @app.route('/generate_questions', methods=['POST'])
 def generate_questions():
     """Generate questions based on document type"""
+    req = parse_body(GenerateQuestionsRequest)
     try:
-        data = request.json
-        doc_type = data.get('doc_type')
-        language = data.get('language', 'English')
-
-        if not doc_type:
-            return jsonify({"error": "doc_type is required"}), 400
-
-        # Create the prompt
-        if language == "Hindi":
-            question_prompt = translate_to_hindi(
-                f"Generate a list of specific questions that will help clarify the names and details needed to create a {doc_type}. "
-                f"Focus on gathering names, dates, and other essential information. "
-                f"Provide exactly 8-10 clear questions, one per line, numbered."
-            )
-        else:
-            question_prompt = (
-                f"Generate a list of specific questions that will help clarify the names and details needed to create a {doc_type}. "
-                f"Focus on gathering names, dates, and other essential information. "
-                f"Provide exactly 8-10 clear questions, one per line, numbered."
-            )
-
-        # Generate questions using Gemini
-        questions_text = generate_with_gemini(question_prompt)
-        
-        # Split and clean questions
-        questions_list = [q.strip() for q in questions_text.strip().split('\n') if q.strip()]
+        questions_list = list(get_questions(req.doc_type, req.language))
         
         return jsonify({"questions": questions_list})
     
@@ -119,156 +549,119 @@ def generate_questions():
 @app.route('/generate_document', methods=['POST'])
 def generate_document():
     """Generate a legal document based on answers"""
+    req = parse_body(GenerateDocumentRequest)
     try:
-        data = request.json
-        doc_type = data.get('doc_type')
-        doc_title = data.get('title', f"New {doc_type}")
-        answers = data.get('answers', {})
-        language = data.get('language', 'English')
-
-        if not doc_type:
-            return jsonify({"error": "doc_type is required"}), 400
-
-        # First, generate questions to understand the context
-        if language == "Hindi":
-            question_prompt = translate_to_hindi(
-                f"Generate a list of specific questions that will help clarify the names and details needed to create a {doc_type}. "
-                f"Focus on gathering names, dates, and other essential information. "
-                f"Provide exactly 8-10 clear questions, one per line, numbered."
-            )
-        else:
-            question_prompt = (
-                f"Generate a list of specific questions that will help clarify the names and details needed to create a {doc_type}. "
-                f"Focus on gathering names, dates, and other essential information. "
-                f"Provide exactly 8-10 clear questions, one per line, numbered."
-            )
+        doc_type = req.doc_type
+        doc_title = req.title if req.title is not None else f"New {doc_type}"
+        answers = req.answers
+        language = req.language
 
-        questions_text = generate_with_gemini(question_prompt)
-        questions_list = [q.strip() for q in questions_text.strip().split('\n') if q.strip()]
-        
-        # Create answers text from provided answers
-        answers_text = ' '.join([f"{q}: {answers.get(q, '')}" for q in answers.keys() if answers.get(q)])
-        
-        # If no answers provided, use all questions with empty values
-        if not answers_text:
-            answers_text = "No specific details provided. Generate a template document."
-
-        # Generate the document
-        if language == "Hindi":
-            doc_prompt = translate_to_hindi(
-                f"You are a professional legal document expert. Generate a complete and properly formatted {doc_type} "
-                f"using the following details:\n\n{answers_text}\n\n"
-                f"The document should be:\n"
-                f"- Professionally formatted\n"
-                f"- Legally sound\n"
-                f"- Complete with all necessary sections\n"
-                f"- Ready to use\n\n"
-                f"Generate the complete document now:"
-            )
-        else:
-            doc_prompt = (
-                f"You are a professional legal document expert. Generate a complete and properly formatted {doc_type} "
-                f"using the following details:\n\n{answers_text}\n\n"
-                f"The document should be:\n"
-                f"- Professionally formatted\n"
-                f"- Legally sound\n"
-                f"- Complete with all necessary sections\n"
-                f"- Ready to use\n\n"
-                f"Generate the complete document now:"
-            )
-
-        document_text = generate_with_gemini(doc_prompt)
+        # The client already has the questions from /generate_questions, so the
+        # document is generated from the submitted answers in a single Gemini call
+        document_text = generate_document_text(doc_type, answers, language)
 
-        # Create a unique ID for the document
-        doc_id = str(uuid.uuid4())
-        
         # Save the document
-        document = {
-            "id": doc_id,
-            "title": doc_title,
-            "document_text": document_text,
-            "doc_type": doc_type,
-            "language": language,
-            "answers": answers
-        }
-        documents[doc_id] = document
+        document = save_new_document(doc_title, document_text, doc_type, language, answers)
         
-        return jsonify({"document": document})
+        return json_response({"document": document})
     
     except Exception as e:
         return jsonify({
             "error": f"Error generating document: {str(e)}"
         }), 500
 
+@app.route('/generate_document/stream', methods=['POST'])
+def generate_document_stream():
+    """Generate a legal document, streaming the text as server-sent events.
+
+    Emits a "data" event per generated chunk, then a "done" event carrying the
+    saved document (or an "error" event if generation fails).
+    """
+    req = parse_body(GenerateDocumentRequest)
+    try:
+        doc_type = req.doc_type
+        doc_title = req.title if req.title is not None else f"New {doc_type}"
+        answers = req.answers
+        language = req.language
+
+        # Template documents (no answers) are served whole from the cache
+        cached = get_template_document(doc_type, answers, language)
+        if cached is None:
+            doc_prompt = build_doc_prompt(doc_type, build_answers_text(answers), language)
+
+    except Exception as e:
+        return jsonify({
+            "error": f"Error generating document: {str(e)}"
+        }), 500
+
+    def events():
+        chunks = []
+        try:
+            for text in ([cached] if cached is not None else stream_with_gemini(doc_prompt)):
+                chunks.append(text)
+                yield sse_event({"text": text})
+
+            document_text = ''.join(chunks).strip()
+            if cached is None:
+                save_template_document(doc_type, answers, language, document_text)
+            document = save_new_document(doc_title, document_text, doc_type, language, answers)
+        except Exception as e:
+            yield sse_event({"error": f"Error generating document: {str(e)}"}, event="error")
+            return
+
+        yield sse_event({"document": document}, event="done")
+
+    return Response(
+        stream_with_context(events()),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 @app.route('/documents', methods=['GET'])
 def get_documents():
     """Get all documents"""
-    return jsonify({"documents": list(documents.values())})
+    # Answer repeat requests with 304 until a document is saved or deleted
+    etag = documents.version()
+    if etag in request.if_none_match:
+        response = Response(status=304)
+    else:
+        response = json_response({"documents": documents.all()})
+    response.set_etag(etag)
+    return response
 
 @app.route('/documents/<document_id>', methods=['GET'])
 def get_document(document_id):
     """Get a specific document by ID"""
     document = documents.get(document_id)
-    if document:
-        return jsonify({"document": document})
+    if document is not None:
+        return json_response({"document": document})
     return jsonify({"error": "Document not found"}), 404
 
 @app.route('/documents/<document_id>', methods=['PUT'])
 def edit_document(document_id):
     """Edit an existing document"""
+    req = parse_body(EditDocumentRequest)
     try:
-        if document_id not in documents:
+        document = documents.get(document_id)
+        if document is None:
             return jsonify({"error": "Document not found"}), 404
         
-        data = request.json
-        document = documents[document_id]
-        
         # Update document fields
-        if 'document_text' in data:
-            document['document_text'] = data['document_text']
-        if 'title' in data:
-            document['title'] = data['title']
+        if req.document_text is not None:
+            document['document_text'] = req.document_text
+        if req.title is not None:
+            document['title'] = req.title
         
         # If answers were updated, regenerate the document
-        if 'answers' in data and data.get('regenerate', False):
-            document['answers'] = data['answers']
+        if req.answers is not None and req.regenerate:
+            document['answers'] = req.answers
             
-            language = document['language']
-            doc_type = document['doc_type']
-            answers = document['answers']
-            
-            # Create answers text
-            answers_text = ' '.join([f"{q}: {answers.get(q, '')}" for q in answers.keys() if answers.get(q)])
-            
-            # Generate document prompt
-            if language == "Hindi":
-                doc_prompt = translate_to_hindi(
-                    f"You are a professional legal document expert. Generate a complete and properly formatted {doc_type} "
-                    f"using the following details:\n\n{answers_text}\n\n"
-                    f"The document should be:\n"
-                    f"- Professionally formatted\n"
-                    f"- Legally sound\n"
-                    f"- Complete with all necessary sections\n"
-                    f"- Ready to use\n\n"
-                    f"Generate the complete document now:"
-                )
-            else:
-                doc_prompt = (
-                    f"You are a professional legal document expert. Generate a complete and properly formatted {doc_type} "
-                    f"using the following details:\n\n{answers_text}\n\n"
-                    f"The document should be:\n"
-                    f"- Professionally formatted\n"
-                    f"- Legally sound\n"
-                    f"- Complete with all necessary sections\n"
-                    f"- Ready to use\n\n"
-                    f"Generate the complete document now:"
-                )
-
-            document_text = generate_with_gemini(doc_prompt)
-            document['document_text'] = document_text
+            document['document_text'] = generate_document_text(
+                document['doc_type'], document['answers'], document['language']
+            )
         
-        documents[document_id] = document
-        return jsonify({"document": document})
+        documents.save(document)
+        return json_response({"document": document})
     
     except Exception as e:
         return jsonify({
@@ -278,24 +671,29 @@ def edit_document(document_id):
 @app.route('/documents/<document_id>', methods=['DELETE'])
 def delete_document(document_id):
     """Delete a document"""
-    if document_id not in documents:
+    if not documents.delete(document_id):
         return jsonify({"error": "Document not found"}), 404
     
-    del documents[document_id]
     return jsonify({"success": True, "message": "Document deleted successfully"})
 
 @app.route('/translate', methods=['POST'])
 def translate_text():
-    """Translate text to Hindi"""
+    """Translate text (a string or a list of strings) to Hindi"""
+    req = parse_body(TranslateRequest)
     try:
-        data = request.json
-        text = data.get('text')
-        target_language = data.get('target', 'hi')
+        text = req.text
+        target_language = req.target
         
         if not text:
             return jsonify({"error": "text is required"}), 400
         
-        translated = GoogleTranslator(source='auto', target=target_language).translate(text)
+        if isinstance(text, list):
+            # User text is not memoised, so it can't evict the cached prompt translations
+            translated = list(translation_executor.map(
+                lambda t: get_translator(target_language).translate(t) if t.strip() else t, text
+            ))
+        else:
+            translated = get_translator(target_language).translate(text)
         return jsonify({"translated_text": translated})
     
     except Exception as e:
@@ -303,6 +701,20 @@ def translate_text():
             "error": f"Translation error: {str(e)}"
         }), 500
 
+@app.errorhandler(ValidationError)
+def invalid_request(error):
+    return jsonify({
+        "error": "Invalid request body",
+        "details": error.errors(include_url=False, include_context=False, include_input=False)
+    }), 422
+
+@app.errorhandler(400)
+def bad_request(error):
+    return jsonify({
+        "error": "Bad request",
+        "message": error.description
+    }), 400
+
 @app.errorhandler(404)
 def not_found(error):
     return jsonify({
@@ -317,5 +729,8 @@ def internal_error(error):
         "message": "An unexpected error occurred on the server"
     }), 500
 
+# Development server only; in production run under Gunicorn with gevent
+# workers using the settings in gunicorn.conf.py:
+#   gunicorn FlaskApp:app
 if __name__ == '__main__':
-    app.run(debug=True, host='0.0.0.0', port=5000)
\ No newline at end of file
+    app.run(debug=os.getenv("FLASK_DEBUG") == "1", host='0.0.0.0', port=5000)
\ No newline at end of file
@@ -0,0 +1,17 @@
+# Gunicorn settings, picked up automatically by `gunicorn FlaskApp:app`
+import os
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+bind = os.getenv("BIND", "0.0.0.0:5000")
+
+# Handlers spend most of their time waiting on Gemini and the translator, so
+# gevent lets each worker serve many requests concurrently
+worker_class = "gevent"
+worker_connections = int(os.getenv("WORKER_CONNECTIONS", "1000"))
+
+# Documents are only shared between workers when they are stored in Redis,
+# so default to a single worker otherwise
+workers = int(os.getenv("WEB_CONCURRENCY", "4" if os.getenv("REDIS_URL") else "1"))